@@ -44,6 +44,7 @@
 
 #define RTAS_BUF_SIZE   3000
 #define RTAS_STR_SIZE   1024
+#define STDIN_BUF_SIZE  (64 * 1024)
 char rtas_buf[RTAS_BUF_SIZE];
 
 /**
@@ -53,10 +54,11 @@ char rtas_buf[RTAS_BUF_SIZE];
  * @param fh file to read RTAS event from
  * @param msgbuf buffer to write RTAS event into
  * @param buflen length of "msgbuf"
+ * @param event_no set to the event number found on the "event begin" line
  * @return amount read into msgbuf
  */
 int
-get_buffer(FILE *fh, char *msgbuf, size_t buflen)
+get_buffer(FILE *fh, char *msgbuf, size_t buflen, int *event_no)
 {
     char tmpbuf[RTAS_STR_SIZE];
     unsigned int val;
@@ -70,7 +72,13 @@ get_buffer(FILE *fh, char *msgbuf, size_t buflen)
 
     while (line) {
         /* Skip over any obviously busted input ... */
-        if (strstr (tmpbuf, "event begin")) goto next;
+        if (strstr (tmpbuf, "event begin")) {
+            /* "RTAS: <event_no> -------- RTAS event begin --------" */
+            p = strstr (tmpbuf, "RTAS:");
+            if (p)
+                sscanf (p, "RTAS: %d", event_no);
+            goto next;
+        }
         if (strstr (tmpbuf, "eventbegin")) goto next;
         if (strstr (tmpbuf, "event end")) goto done;
         if (strstr (tmpbuf, "eventend")) goto done;
@@ -102,9 +110,16 @@ get_buffer(FILE *fh, char *msgbuf, size_t buflen)
 		}
 	    }
 
-            /* Don't overflow the output buffer */
-            if (j >= buflen) 
+            /* Don't overflow the output buffer; drop the rest of the
+             * event so it isn't taken for the start of the next one */
+            if (j >= buflen) {
+                while (fgets(tmpbuf, RTAS_STR_SIZE, fh)) {
+                    if (strstr(tmpbuf, "event end") ||
+                        strstr(tmpbuf, "eventend"))
+                        break;
+                }
                 goto done;
+            }
             p++;
 	}
 next:
@@ -138,6 +153,7 @@ main(int argc , char *argv[])
 {
     struct rtas_event *re;
     int     event_no = -1;
+    int     found_event_no;
     int     verbose = 0;
     int     dump_raw = 0;
     int     len = 0;
@@ -178,13 +194,29 @@ main(int argc , char *argv[])
         }
     }
 
-    rtas_buf_len = get_buffer(stdin, rtas_buf, RTAS_BUF_SIZE);
+    /*
+     * Several events may be read from stdin, each one terminated by an
+     * "event end" line.  Unless an event number was given with -n, each
+     * event is numbered from its own "event begin" line.  An event that
+     * can't be parsed is skipped rather than ending the run.
+     */
+    setvbuf(stdin, NULL, _IOFBF, STDIN_BUF_SIZE);
+
+    while (!feof(stdin) && !ferror(stdin)) {
+        found_event_no = -1;
+        rtas_buf_len = get_buffer(stdin, rtas_buf, RTAS_BUF_SIZE,
+                                  &found_event_no);
+        if (rtas_buf_len == 0)
+            continue;
 
-    re = parse_rtas_event(rtas_buf, rtas_buf_len);
+        re = parse_rtas_event(rtas_buf, rtas_buf_len);
+        if (re == NULL)
+            continue;
 
-    while (re != NULL) {
         if (event_no != -1)
             re->event_no = event_no;
+        else if (found_event_no != -1)
+            re->event_no = found_event_no;
 
         if (dump_raw) { 
             len += rtas_print_raw_event(stdout, re);
@@ -195,9 +227,6 @@ main(int argc , char *argv[])
         fflush(stdout);
 
         cleanup_rtas_event(re);
-
-        rtas_buf_len = get_buffer(stdin, rtas_buf, RTAS_BUF_SIZE);
-        re = parse_rtas_event(rtas_buf, rtas_buf_len);
     }
             
     return len;